@@ -9,6 +9,7 @@ Usage:
     python scripts/download_icons.py              # Download all packs
     python scripts/download_icons.py ionicons     # Download specific pack
     python scripts/download_icons.py --list       # List available packs
+    python scripts/download_icons.py --bundle     # Install packs as icons.zip bundles
 
 Requirements:
     pip install httpx  # For async HTTP requests
@@ -16,9 +17,16 @@ Requirements:
 
 import argparse
 import asyncio
+import io
+import os
+import shutil
+import sys
 import tempfile
 import zipfile
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO
 
 try:
     import httpx
@@ -27,7 +35,19 @@ except ImportError:
     raise SystemExit(1) from None
 
 # Base directory for packs
-PACKS_DIR = Path(__file__).parent.parent / "src" / "djicons" / "packs"
+SRC_DIR = Path(__file__).parent.parent / "src"
+PACKS_DIR = SRC_DIR / "djicons" / "packs"
+
+# Count icons with this checkout's djicons, whether or not it is installed
+sys.path.insert(0, str(SRC_DIR))
+from djicons.packs import count_pack_icons  # noqa: E402
+
+# Read size for streamed downloads
+CHUNK_SIZE = 1 << 16
+
+# Archives up to this size are buffered in memory; larger ones (such as
+# material) are spilled to an anonymous temporary file
+MEMORY_ARCHIVE_MAX_BYTES = 64 * 1024 * 1024
 
 # Icon pack configurations
 PACKS = {
@@ -126,13 +146,39 @@ TRANSFORMS = {
 }
 
 
-async def download_file(client: httpx.AsyncClient, url: str, dest: Path) -> None:
-    """Download a file from URL to destination."""
+async def download_file(client: httpx.AsyncClient, url: str) -> BinaryIO:
+    """
+    Stream a file from URL into a buffer, rewound and ready to read.
+
+    The file is kept in memory unless its Content-Length, or the bytes
+    received so far when the server sends none, exceed
+    MEMORY_ARCHIVE_MAX_BYTES; it is then written to a temporary file.
+    SpooledTemporaryFile would do this, but ZipFile cannot read it on
+    Python 3.10 (it lacks seekable()).
+    """
     print(f"  Downloading from {url}...")
-    response = await client.get(url, follow_redirects=True)
-    response.raise_for_status()
-    dest.write_bytes(response.content)
-    print(f"  Downloaded {len(response.content) / 1024 / 1024:.1f} MB")
+    size = 0
+    async with client.stream("GET", url, follow_redirects=True) as response:
+        response.raise_for_status()
+        length = response.headers.get("Content-Length", "")
+        dest: BinaryIO = io.BytesIO()
+        if length.isdigit() and int(length) > MEMORY_ARCHIVE_MAX_BYTES:
+            dest = tempfile.TemporaryFile(suffix=".zip")
+        try:
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                dest.write(chunk)
+                size += len(chunk)
+                if size > MEMORY_ARCHIVE_MAX_BYTES and isinstance(dest, io.BytesIO):
+                    spilled = tempfile.TemporaryFile(suffix=".zip")
+                    spilled.write(dest.getbuffer())
+                    dest.close()
+                    dest = spilled
+        except BaseException:
+            dest.close()
+            raise
+    dest.seek(0)
+    print(f"  Downloaded {size / 1024 / 1024:.1f} MB")
+    return dest
 
 
 def match_pattern(name: str, pattern: str) -> bool:
@@ -142,74 +188,107 @@ def match_pattern(name: str, pattern: str) -> bool:
     return fnmatch.fnmatch(name, pattern)
 
 
+def match_prefix(name: str, prefixes: list[tuple[str, str]]) -> str | None:
+    """Return the style of the first path prefix that matches, if any."""
+    for prefix, style in prefixes:
+        if name.startswith(prefix):
+            return style
+    return None
+
+
+def svg_stem(name: str) -> str:
+    """Return the file name of an archive entry without its .svg suffix."""
+    return name.rsplit("/", 1)[-1][:-4]
+
+
+def extract_entry(zf: zipfile.ZipFile, name: str, output_file: Path) -> None:
+    """Decompress a single archive entry and write its bytes to disk unchanged."""
+    with zf.open(name) as src, output_file.open("wb") as dst:
+        shutil.copyfileobj(src, dst)
+
+
 def extract_svgs(
-    zip_path: Path,
+    archive: BinaryIO,
     pack_name: str,
     config: dict,
     output_dir: Path,
+    bundle_file: Path | None = None,
 ) -> int:
-    """Extract SVG files from zip to output directory."""
-    count = 0
+    """
+    Extract SVG files from an open zip archive to output directory.
+
+    If bundle_file is given, the SVGs are written into that single zip
+    archive instead of one loose file per icon.
+    """
     transform_fn = TRANSFORMS.get(config.get("transform"))
+    # Output file -> archive entry; a later entry wins, as with sequential writes
+    jobs: dict[Path, str] = {}
+
+    with zipfile.ZipFile(archive, "r") as zf:
+        # Read the central directory once and keep only SVG entries
+        svg_names = [name for name in zf.namelist() if name.endswith(".svg")]
 
-    with zipfile.ZipFile(zip_path, "r") as zf:
         # Handle pattern matching (like material with nested folders)
         if "svg_pattern" in config:
             pattern = config["svg_pattern"]
-            for name in zf.namelist():
+            for name in svg_names:
                 if match_pattern(name, pattern):
-                    # Read SVG content
-                    svg_content = zf.read(name).decode("utf-8")
-
                     # Get filename (remove _24px suffix for material)
-                    filename = Path(name).stem
+                    filename = svg_stem(name)
                     if transform_fn:
                         filename = transform_fn(filename, "")
 
-                    # Write to output
-                    output_file = output_dir / f"{filename}.svg"
-                    output_file.write_text(svg_content)
-                    count += 1
-        # Handle multiple paths (like heroicons with outline/solid/mini)
-        elif "svg_paths" in config:
-            for svg_path, style in config["svg_paths"]:
-                for name in zf.namelist():
-                    if name.startswith(svg_path) and name.endswith(".svg"):
-                        # Read SVG content
-                        svg_content = zf.read(name).decode("utf-8")
-
-                        # Get filename
-                        filename = Path(name).stem
-                        if transform_fn:
-                            filename = transform_fn(filename, style)
-
-                        # Write to output
-                        output_file = output_dir / f"{filename}.svg"
-                        output_file.write_text(svg_content)
-                        count += 1
+                    jobs[output_dir / f"{filename}.svg"] = name
         else:
-            # Single path
-            svg_path = config["svg_path"]
-            for name in zf.namelist():
-                if name.startswith(svg_path) and name.endswith(".svg"):
-                    # Read SVG content
-                    svg_content = zf.read(name).decode("utf-8")
-
-                    # Get filename
-                    filename = Path(name).stem
-                    if transform_fn:
-                        filename = transform_fn(filename, "")
-
-                    # Write to output
-                    output_file = output_dir / f"{filename}.svg"
-                    output_file.write_text(svg_content)
-                    count += 1
-
-    return count
-
-
-async def download_pack(pack_name: str) -> None:
-    """Download and install an icon pack."""
+            # Single path, or multiple paths (like heroicons with outline/solid/mini).
+            # Walk the entries once and dispatch each one by its path prefix.
+            prefixes = config.get("svg_paths") or [(config["svg_path"], "")]
+            for name in svg_names:
+                style = match_prefix(name, prefixes)
+                if style is None:
+                    continue
+
+                # Get filename
+                filename = svg_stem(name)
+                if transform_fn:
+                    filename = transform_fn(filename, style)
+
+                jobs[output_dir / f"{filename}.svg"] = name
+
+        if bundle_file is not None:
+            # One archive on disk instead of thousands of small files. It is
+            # written next to the final path and moved into place once
+            # complete, so an interrupted run never leaves a truncated bundle.
+            tmp_file = bundle_file.with_name(f"{bundle_file.name}.tmp")
+            try:
+                with zipfile.ZipFile(tmp_file, "w", zipfile.ZIP_DEFLATED) as bundle:
+                    for output_file, name in jobs.items():
+                        bundle.writestr(output_file.name, zf.read(name))
+                os.replace(tmp_file, bundle_file)
+            except BaseException:
+                tmp_file.unlink(missing_ok=True)
+                raise
+            return len(jobs)
+
+        # Decompress and write in parallel; zlib releases the GIL and ZipFile
+        # serializes access to the shared archive handle internally.
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [
+                executor.submit(extract_entry, zf, name, output_file)
+                for output_file, name in jobs.items()
+            ]
+            for future in futures:
+                future.result()
+
+    return len(jobs)
+
+
+async def download_pack(
+    pack_name: str,
+    client: httpx.AsyncClient,
+    bundle: bool = False,
+) -> None:
+    """Download and install an icon pack using a shared HTTP client."""
     if pack_name not in PACKS:
         print(f"Unknown pack: {pack_name}")
         print(f"Available packs: {', '.join(PACKS.keys())}")
@@ -220,35 +299,71 @@ async def download_pack(pack_name: str) -> None:
     print(f"Downloading {config['name']} v{config['version']}")
     print(f"{'=' * 60}")
 
-    # Create output directory
     output_dir = PACKS_DIR / pack_name / "icons"
-    output_dir.mkdir(parents=True, exist_ok=True)
+    bundle_file = PACKS_DIR / pack_name / "icons.zip"
+
+    archive = await download_file(client, config["url"])
+    with archive:
+        # Only clear the installed pack once its download has succeeded:
+        # recreate an empty output directory (keeping the tracked .gitkeep).
+        # A previous bundle is replaced atomically in bundle mode, and must
+        # go otherwise since register() prefers it over loose icons.
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / ".gitkeep").touch()
+        if not bundle:
+            bundle_file.unlink(missing_ok=True)
+
+        # Extract SVGs in a worker thread so other packs keep downloading
+        print(f"  Extracting SVGs ({pack_name})...")
+        count = await asyncio.to_thread(
+            extract_svgs,
+            archive,
+            pack_name,
+            config,
+            output_dir,
+            bundle_file if bundle else None,
+        )
+        print(f"  Extracted {count} icons to {bundle_file if bundle else output_dir}")
+
+
+def make_client() -> httpx.AsyncClient:
+    """Create an HTTP client whose connection pool is shared across packs."""
+    return httpx.AsyncClient(
+        timeout=60.0,
+        limits=httpx.Limits(max_connections=12, max_keepalive_connections=12),
+    )
 
-    # Clear existing icons
-    for svg_file in output_dir.glob("*.svg"):
-        svg_file.unlink()
 
-    # Download zip
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
-            tmp_path = Path(tmp.name)
+async def _run(pack_names: Iterable[str], bundle: bool = False) -> list[str]:
+    """
+    Download the given packs concurrently over a single HTTP client.
 
-        try:
-            await download_file(client, config["url"], tmp_path)
+    A failing pack does not cancel the others; its error is reported and
+    its previously installed icons are left untouched.
 
-            # Extract SVGs
-            print("  Extracting SVGs...")
-            count = extract_svgs(tmp_path, pack_name, config, output_dir)
-            print(f"  Extracted {count} icons to {output_dir}")
+    Returns:
+        Names of the packs that failed
+    """
+    pack_names = list(pack_names)
+    async with make_client() as client:
+        results = await asyncio.gather(
+            *(download_pack(name, client, bundle) for name in pack_names),
+            return_exceptions=True,
+        )
 
-        finally:
-            tmp_path.unlink(missing_ok=True)
+    failed = []
+    for name, result in zip(pack_names, results, strict=True):
+        if isinstance(result, Exception):
+            print(f"\nFailed to download {name}: {result}")
+            failed.append(name)
+    return failed
 
 
-async def download_all() -> None:
-    """Download all icon packs."""
-    for pack_name in PACKS:
-        await download_pack(pack_name)
+async def download_all(bundle: bool = False) -> list[str]:
+    """Download all icon packs concurrently. Returns the packs that failed."""
+    return await _run(PACKS, bundle)
 
 
 def list_packs() -> None:
@@ -257,8 +372,8 @@ def list_packs() -> None:
     print("-" * 60)
 
     for pack_name, config in PACKS.items():
-        icons_dir = PACKS_DIR / pack_name / "icons"
-        icon_count = len(list(icons_dir.glob("*.svg"))) if icons_dir.exists() else 0
+        # Counted the same way as the pack's own get_metadata()
+        icon_count = count_pack_icons(PACKS_DIR / pack_name)
         status = f"{icon_count} icons" if icon_count > 0 else "not installed"
 
         print(f"  {pack_name:12} {config['name']:20} v{config['version']:10} ({status})")
@@ -277,6 +392,7 @@ Examples:
   python download_icons.py ionicons     Download only Ionicons
   python download_icons.py heroicons tabler   Download multiple packs
   python download_icons.py --list       List available packs
+  python download_icons.py --bundle     Install each pack as a single icons.zip
         """,
     )
     parser.add_argument(
@@ -289,6 +405,11 @@ Examples:
         action="store_true",
         help="List available icon packs",
     )
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help="Write each pack to a single icons.zip instead of loose SVG files",
+    )
 
     args = parser.parse_args()
 
@@ -297,10 +418,13 @@ Examples:
         return
 
     if args.packs:
-        for pack_name in args.packs:
-            asyncio.run(download_pack(pack_name))
+        failed = asyncio.run(_run(args.packs, args.bundle))
     else:
-        asyncio.run(download_all())
+        failed = asyncio.run(download_all(args.bundle))
+
+    if failed:
+        print(f"\nFailed packs: {', '.join(failed)}")
+        raise SystemExit(1)
 
     print("\nDone! Icon packs have been installed.")
     print("You can now use them in your Django templates:")
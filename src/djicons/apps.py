@@ -1,5 +1,6 @@
 """Django app configuration for djicons."""
 
+from importlib import import_module
 from pathlib import Path
 
 from django.apps import AppConfig
@@ -14,6 +15,16 @@ PACK_NAMESPACES = {
     "fontawesome": "fa",
 }
 
+# Mapping from pack names to the modules that provide register()
+PACK_MODULES = {
+    "ionicons": "djicons.packs.ionicons",
+    "heroicons": "djicons.packs.heroicons",
+    "material": "djicons.packs.material",
+    "tabler": "djicons.packs.tabler",
+    "lucide": "djicons.packs.lucide",
+    "fontawesome": "djicons.packs.fontawesome",
+}
+
 
 class DjiconsConfig(AppConfig):
     """Django app configuration for djicons."""
@@ -174,31 +185,12 @@ class DjiconsConfig(AppConfig):
         packs = get_setting("PACKS")
 
         for pack_name in packs:
+            module_path = PACK_MODULES.get(pack_name)
+            if not module_path:
+                continue
             try:
-                if pack_name == "ionicons":
-                    from .packs.ionicons import register
-
-                    register(icons)
-                elif pack_name == "heroicons":
-                    from .packs.heroicons import register
-
-                    register(icons)
-                elif pack_name == "material":
-                    from .packs.material import register
-
-                    register(icons)
-                elif pack_name == "tabler":
-                    from .packs.tabler import register
-
-                    register(icons)
-                elif pack_name == "lucide":
-                    from .packs.lucide import register
-
-                    register(icons)
-                elif pack_name == "fontawesome":
-                    from .packs.fontawesome import register
-
-                    register(icons)
+                # Only configured packs are imported
+                import_module(module_path).register(icons)
             except ImportError:
                 # Pack not available (icons not downloaded yet)
                 pass
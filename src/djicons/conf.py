@@ -3,6 +3,7 @@
 from typing import Any
 
 from django.conf import settings
+from django.core.signals import setting_changed
 
 # Default settings
 DEFAULTS: dict[str, Any] = {
@@ -51,9 +52,16 @@ DEFAULTS: dict[str, Any] = {
     "ALIASES": {},
     # Directory to store collected icons (for 'local' mode after djicons_collect)
     "COLLECT_DIR": None,
+    # Template files larger than this (in bytes) are skipped when scanning
+    # for icon usages (None = no limit)
+    "MAX_TEMPLATE_BYTES": 4 * 1024 * 1024,
 }
 
 
+# Resolved settings, cleared whenever DJICONS settings change (e.g. override_settings)
+_CACHE: dict[str, Any] = {}
+
+
 def get_setting(name: str) -> Any:
     """
     Get a djicons setting with fallback to default.
@@ -68,12 +76,24 @@ def get_setting(name: str) -> Any:
         DJICONS_DEFAULT_NAMESPACE = 'hero'
         DJICONS_PACKS = ['heroicons', 'ionicons']
 
+    Resolved values are cached per process; the cache is cleared when
+    Django sends ``setting_changed`` for a DJICONS setting.
+
     Args:
         name: Setting name without DJICONS_ prefix
 
     Returns:
         Setting value
     """
+    try:
+        return _CACHE[name]
+    except KeyError:
+        value = _CACHE[name] = _resolve_setting(name)
+        return value
+
+
+def _resolve_setting(name: str) -> Any:
+    """Look up a djicons setting without the cache."""
     # First check DJICONS dict
     djicons_settings = getattr(settings, "DJICONS", {})
     if name in djicons_settings:
@@ -86,3 +106,12 @@ def get_setting(name: str) -> Any:
 
     # Return default
     return DEFAULTS.get(name)
+
+
+def _clear_cache(*, setting: str, **kwargs: Any) -> None:
+    """Drop cached settings when a DJICONS setting changes."""
+    if setting == "DJICONS" or setting.startswith("DJICONS_"):
+        _CACHE.clear()
+
+
+setting_changed.connect(_clear_cache)
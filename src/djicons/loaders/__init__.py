@@ -7,6 +7,7 @@ Available loaders:
     - DirectoryIconLoader: Load SVG files from a directory
     - CDNIconLoader: Load SVG files from CDN (for development)
     - S3IconLoader: Load SVG files from an AWS S3 bucket
+    - ZipIconLoader: Load SVG files from a single zip bundle
     - BaseIconLoader: Abstract base class for custom loaders
 """
 
@@ -14,10 +15,12 @@ from .base import BaseIconLoader
 from .cdn import CDNIconLoader
 from .directory import DirectoryIconLoader
 from .s3 import S3IconLoader
+from .zip import ZipIconLoader
 
 __all__ = [
     "BaseIconLoader",
     "CDNIconLoader",
     "DirectoryIconLoader",
     "S3IconLoader",
+    "ZipIconLoader",
 ]
@@ -0,0 +1,120 @@
+"""
+Zip icon loader - Load SVG files from a single zip bundle.
+
+Icon packs can be installed as one ``icons.zip`` archive instead of
+thousands of loose files (see ``scripts/download_icons.py --bundle``).
+
+Usage:
+    from djicons.loaders import ZipIconLoader
+    from djicons import icons
+
+    loader = ZipIconLoader("/path/to/icons.zip")
+    icons.register_loader(loader, namespace="myapp")
+
+    # Icons are read from the archive lazily when requested
+    icon = icons.get("myapp:home")  # Reads home.svg from icons.zip
+"""
+
+import threading
+import zipfile
+from pathlib import Path
+
+from .base import BaseIconLoader
+
+
+class ZipIconLoader(BaseIconLoader):
+    """
+    Load icons from a zip archive of SVG files.
+
+    Entries are matched by their file name, so both flat archives
+    (``home.svg``) and nested ones (``icons/home.svg``) work.
+
+    Supports:
+    - Lazy opening of the archive on first use
+    - Custom file extensions
+    - In-memory caching of loaded icons
+    """
+
+    def __init__(self, path: str | Path, extension: str = ".svg") -> None:
+        """
+        Initialize zip loader.
+
+        Args:
+            path: Path to the zip archive
+            extension: File extension to look for (default: .svg)
+        """
+        self.path = Path(path)
+        self.extension = extension
+        self._cache: dict[str, str] = {}
+        self._index: dict[str, str] | None = None
+        self._zipfile: zipfile.ZipFile | None = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> zipfile.ZipFile | None:
+        """Open the archive once and build the name -> entry index."""
+        if self._zipfile is None and self._index is None:
+            index: dict[str, str] = {}
+            try:
+                self._zipfile = zipfile.ZipFile(self.path)
+            except (OSError, zipfile.BadZipFile):
+                self._index = index
+                return None
+
+            for entry in self._zipfile.namelist():
+                if entry.endswith(self.extension):
+                    name = entry.rsplit("/", 1)[-1][: -len(self.extension)]
+                    index[name] = entry
+            self._index = index
+        return self._zipfile
+
+    def load(self, name: str) -> str | None:
+        """
+        Load SVG content by icon name.
+
+        Args:
+            name: Icon name (file name without extension)
+
+        Returns:
+            SVG content as string, or None if not found
+        """
+        # Check memory cache first
+        if name in self._cache:
+            return self._cache[name]
+
+        with self._lock:
+            zf = self._open()
+            entry = self._index.get(name) if self._index else None
+            if zf is None or entry is None:
+                return None
+
+            try:
+                content = zf.read(entry).decode("utf-8")
+            except (OSError, zipfile.BadZipFile, UnicodeDecodeError):
+                return None
+
+        self._cache[name] = content
+        return content
+
+    def list(self) -> list[str]:
+        """
+        List all available icon names.
+
+        Returns:
+            Sorted list of icon names
+        """
+        with self._lock:
+            self._open()
+        return sorted(self._index or {})
+
+    def clear_cache(self) -> None:
+        """Clear the internal cache and close the archive."""
+        with self._lock:
+            self._cache.clear()
+            self._index = None
+            if self._zipfile is not None:
+                self._zipfile.close()
+                self._zipfile = None
+
+    def __repr__(self) -> str:
+        """Debug representation."""
+        return f"ZipIconLoader({self.path!r})"
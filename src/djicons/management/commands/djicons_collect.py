@@ -14,15 +14,21 @@ Usage:
     python manage.py djicons_collect --central    # central directory
     python manage.py djicons_collect --s3         # upload to S3
     python manage.py djicons_collect --dry-run
+    python manage.py djicons_collect --refresh    # revalidate existing icons
 """
 
+import asyncio
+import json
 import logging
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.error import HTTPError, URLError
-from urllib.request import urlopen
+from urllib.request import Request, urlopen
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 from djicons.conf import get_setting
 from djicons.loaders.cdn import CDN_TEMPLATES
@@ -34,6 +40,69 @@ from djicons.scanner import (
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of icons downloaded at the same time
+DEFAULT_CONCURRENCY = 16
+
+# Retries for transient CDN failures (5xx, 429, dropped connections)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+MAX_RETRY_DELAY = 30.0
+
+
+def _retry_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Seconds to wait before the next attempt, honoring a numeric Retry-After."""
+    if retry_after and retry_after.strip().isdigit():
+        return min(float(retry_after), MAX_RETRY_DELAY)
+    return min(RETRY_BACKOFF * 2.0**attempt, MAX_RETRY_DELAY)
+
+
+def _make_url_builder(template: str) -> Callable[[str], str]:
+    """Split a CDN URL template once so building a URL is a plain concatenation."""
+    prefix, sep, suffix = template.partition("{name}")
+    if not sep or "{" in prefix or "{" in suffix:
+        # Anything beyond a single {name} placeholder goes through str.format
+        return lambda name: template.format(name=name)
+    return lambda name: prefix + name + suffix
+
+
+# Precompiled URL builders for each CDN namespace
+CDN_BUILDERS = {namespace: _make_url_builder(t) for namespace, t in CDN_TEMPLATES.items()}
+
+
+# Sidecar file (per icons directory) mapping icon names to CDN ETags
+ETAGS_FILE = ".etags.json"
+
+# (content, etag, error_msg) for one fetched icon
+_FetchResult = tuple[str | None, str | None, str | None]
+
+
+def _load_etags(directory: Path) -> dict[str, str]:
+    """
+    Read the ETags recorded for a directory of collected icons.
+
+    A missing, unreadable or malformed sidecar yields an empty mapping, so
+    every icon in the directory is treated as having no recorded ETag.
+    """
+    try:
+        etags = json.loads((directory / ETAGS_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(etags, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) for k, v in etags.items()
+    ):
+        return {}
+    return etags
+
+
+def _save_etags(directory: Path, etags: dict[str, str]) -> None:
+    """Persist the ETags recorded for a directory of collected icons."""
+    (directory / ETAGS_FILE).write_text(json.dumps(etags, indent=2, sort_keys=True))
+
+
+def _write_sync(path: Path, data: bytes) -> None:
+    """Write icon bytes to disk; open and write happen in one worker call."""
+    path.write_bytes(data)
+
 
 class Command(BaseCommand):
     help = "Collect used icons from templates and download them locally or to S3"
@@ -72,8 +141,23 @@ class Command(BaseCommand):
             default=10.0,
             help="HTTP timeout for downloading icons (default: 10 seconds)",
         )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help=f"Maximum parallel icon downloads (default: {DEFAULT_CONCURRENCY})",
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Revalidate existing icons with conditional requests and update changed ones",
+        )
 
     def handle(self, *args, **options):
+        # Checked here rather than by argparse so call_command kwargs are covered too
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+
         if options["s3"]:
             self._handle_s3(options)
         elif options["central"]:
@@ -83,43 +167,179 @@ class Command(BaseCommand):
 
     def _download_icon_content(self, name, namespace, timeout):
         """Download icon SVG content from CDN. Returns (content, error_msg)."""
-        cdn_url = CDN_TEMPLATES.get(namespace)
-        if not cdn_url:
-            return None, None  # no CDN for this namespace
-
-        url = cdn_url.format(name=name)
-        try:
-            with urlopen(url, timeout=timeout) as response:
-                return response.read().decode("utf-8"), None
-        except HTTPError as e:
-            if e.code == 404:
-                return None, f"[NOT FOUND] {name}"
-            return None, f"[HTTP {e.code}] {name}"
-        except URLError as e:
-            return None, f"[NETWORK ERROR] {name}: {e.reason}"
-        except Exception as e:
-            return None, f"[ERROR] {name}: {e}"
-
-    def _download_icon(self, name, namespace, dest_path, timeout, verbose):
-        """Download a single icon from CDN to disk. Returns True on success."""
-        cdn_url = CDN_TEMPLATES.get(namespace)
-        if not cdn_url:
-            return None  # no CDN for this namespace
-
-        if dest_path.exists():
-            if verbose:
-                self.stdout.write(f"    [EXISTS] {name}")
-            return True
-
-        content, error = self._download_icon_content(name, namespace, timeout)
-        if content:
-            dest_path.write_text(content)
-            if verbose:
-                self.stdout.write(self.style.SUCCESS(f"    [OK] {name}"))
-            return True
-        if error:
+        content, _etag, error = self._fetch_icon(name, namespace, timeout)
+        return content, error
+
+    def _fetch_icon(
+        self, name: str, namespace: str, timeout: float, etag: str | None = None
+    ) -> _FetchResult:
+        """
+        Fetch icon SVG content from CDN. Returns (content, etag, error_msg).
+
+        If ``etag`` is given the request is conditional; when the server
+        answers 304 Not Modified, both content and error_msg are None.
+        Transient failures are retried with exponential backoff.
+        """
+        build_url = CDN_BUILDERS.get(namespace)
+        if not build_url:
+            return None, None, None  # no CDN for this namespace
+
+        headers = {"If-None-Match": etag} if etag else {}
+        request = Request(build_url(name), headers=headers)
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with urlopen(request, timeout=timeout) as response:
+                    content = response.read().decode("utf-8")
+                    return content, response.headers.get("ETag"), None
+            except HTTPError as e:
+                if e.code == 304:
+                    return None, etag, None
+                if e.code == 404:
+                    return None, None, f"[NOT FOUND] {name}"
+                transient = e.code == 429 or e.code >= 500
+                if not transient or attempt == MAX_RETRIES:
+                    return None, None, f"[HTTP {e.code}] {name}"
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                delay = _retry_delay(attempt, retry_after)
+            except (URLError, ConnectionError, TimeoutError) as e:
+                if attempt == MAX_RETRIES:
+                    return None, None, f"[NETWORK ERROR] {name}: {getattr(e, 'reason', e)}"
+                delay = _retry_delay(attempt)
+            except Exception as e:
+                return None, None, f"[ERROR] {name}: {e}"
+            # Runs in a download thread, so sleeping does not block the event loop
+            time.sleep(delay)
+        # The last attempt always returns above
+        raise AssertionError("unreachable")
+
+    async def _fetch_all(
+        self, requests: dict[tuple[str, str], str | None], timeout: float, concurrency: int
+    ) -> dict[tuple[str, str], _FetchResult]:
+        """
+        Fetch (namespace, name) icons concurrently, each exactly once.
+
+        ``requests`` maps each key to the ETag to revalidate, or None.
+        Returns a dict mapping each key to (content, etag, error_msg).
+        """
+        loop = asyncio.get_running_loop()
+        # A pool of its own bounds the in-flight requests: the default executor
+        # is capped at min(32, cpu + 4) threads, which retry sleeps also hold
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, self._fetch_icon, name, namespace, timeout, etag)
+                    for (namespace, name), etag in requests.items()
+                )
+            )
+        return dict(zip(requests, results, strict=True))
+
+    async def _write_all(self, writes: list[tuple[Path, bytes]]) -> None:
+        """Write (path, data) pairs concurrently in the default thread pool."""
+        await asyncio.gather(*(asyncio.to_thread(_write_sync, path, data) for path, data in writes))
+
+    def _fetch_targets(
+        self,
+        targets: Sequence[tuple[Path, str, Iterable[str]]],
+        timeout: float,
+        concurrency: int,
+        refresh: bool,
+    ) -> tuple[dict[tuple[str, str], _FetchResult], dict[Path, dict[str, str]]]:
+        """
+        Fetch every icon needed by (icons_dir, namespace, names) targets.
+
+        All targets share one bounded pool of in-flight requests, and icons
+        needed by several targets are fetched once. Missing icons are always
+        fetched; existing ones only with ``refresh``, conditionally if every
+        copy carries the same ETag.
+
+        Returns (fetched, etags_by_dir) for use with _store_icons().
+        """
+        # Create every target directory once, up front
+        etags_by_dir: dict[Path, dict[str, str]] = {}
+        for icons_dir, _namespace, _names in targets:
+            if icons_dir not in etags_by_dir:
+                icons_dir.mkdir(parents=True, exist_ok=True)
+                etags_by_dir[icons_dir] = _load_etags(icons_dir)
+
+        requests: dict[tuple[str, str], str | None] = {}
+        for icons_dir, namespace, names in targets:
+            for name in names:
+                if (icons_dir / f"{name}.svg").exists():
+                    if not refresh:
+                        continue
+                    etag = etags_by_dir[icons_dir].get(name)
+                else:
+                    etag = None
+                key = (namespace, name)
+                requests[key] = etag if requests.get(key, etag) == etag else None
+
+        fetched = asyncio.run(self._fetch_all(requests, timeout, concurrency))
+        return fetched, etags_by_dir
+
+    def _store_icons(
+        self,
+        icons_dir: Path,
+        namespace: str,
+        names: Iterable[str],
+        fetched: dict[tuple[str, str], _FetchResult],
+        etags: dict[str, str],
+        writes: list[tuple[Path, bytes]],
+        verbose: bool,
+        refresh: bool,
+    ) -> tuple[int, int]:
+        """
+        Report fetch results for one target and queue its file writes.
+
+        Returns (downloaded, failed) counts; existing and unchanged icons
+        count as downloaded.
+        """
+        downloaded = 0
+        failed = 0
+        # Errors seen in unsorted (non-verbose) order, reported sorted below
+        errors: list[tuple[str, str]] = []
+
+        # Success lines only appear in verbose mode, so only sort the whole
+        # set then; otherwise just the (usually few) errors are sorted
+        for name in sorted(names) if verbose else names:
+            svg_path = icons_dir / f"{name}.svg"
+            if not refresh and svg_path.exists():
+                if verbose:
+                    self.stdout.write(f"    [EXISTS] {name}")
+                downloaded += 1
+                continue
+
+            content, etag, error = fetched[(namespace, name)]
+            if content is not None:
+                writes.append((svg_path, content.encode("utf-8")))
+                if etag:
+                    etags[name] = etag
+                if verbose:
+                    self.stdout.write(self.style.SUCCESS(f"    [OK] {name}"))
+                downloaded += 1
+            elif error is None:
+                if verbose:
+                    self.stdout.write(f"    [UNCHANGED] {name}")
+                downloaded += 1
+            else:
+                if verbose:
+                    self.stdout.write(self.style.ERROR(f"    {error}"))
+                else:
+                    errors.append((name, error))
+                failed += 1
+
+        for _name, error in sorted(errors):
             self.stdout.write(self.style.ERROR(f"    {error}"))
-        return False
+
+        return downloaded, failed
+
+    def _flush(
+        self, writes: list[tuple[Path, bytes]], etags_by_dir: dict[Path, dict[str, str]]
+    ) -> None:
+        """Write queued icons to disk and persist any updated ETags."""
+        asyncio.run(self._write_all(writes))
+        for icons_dir, etags in etags_by_dir.items():
+            if etags and etags != _load_etags(icons_dir):
+                _save_etags(icons_dir, etags)
 
     def _handle_s3(self, options):
         """Collect icons and upload them to S3."""
@@ -325,6 +545,8 @@ class Command(BaseCommand):
         dry_run = options["dry_run"]
         verbose = options["verbosity"] >= 2
         timeout = options["timeout"]
+        concurrency = options["concurrency"]
+        refresh = options["refresh"]
         default_namespace = get_setting("DEFAULT_NAMESPACE") or "ion"
 
         self.stdout.write(
@@ -337,11 +559,6 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("No icons found in templates."))
             return
 
-        # Count total unique icons
-        all_icons = set()
-        for grouped in per_app.values():
-            for names in grouped.values():
-                all_icons.update(names)
         self.stdout.write(f"Found icons across {len(per_app)} apps.")
 
         if dry_run:
@@ -353,9 +570,18 @@ class Command(BaseCommand):
                     self.stdout.write(f"  {namespace}: {', '.join(sorted(names))}")
             return
 
+        targets = [
+            (app_path / "static" / "icons" / namespace, namespace, names)
+            for app_path, grouped in per_app.items()
+            for namespace, names in grouped.items()
+            if namespace in CDN_TEMPLATES
+        ]
+        fetched, etags_by_dir = self._fetch_targets(targets, timeout, concurrency, refresh)
+
         total_downloaded = 0
         total_failed = 0
         total_skipped_ns = 0
+        writes: list[tuple[Path, bytes]] = []
 
         for app_path, grouped in sorted(per_app.items()):
             self.stdout.write(f"\n{self.style.MIGRATE_HEADING(app_path.name)}")
@@ -370,19 +596,24 @@ class Command(BaseCommand):
                     total_skipped_ns += 1
                     continue
 
-                # Create static/icons/{namespace}/ inside this app
                 icons_dir = app_path / "static" / "icons" / namespace
-                icons_dir.mkdir(parents=True, exist_ok=True)
 
                 self.stdout.write(f"  {namespace}: {len(names)} icons → {icons_dir}")
 
-                for name in sorted(names):
-                    svg_path = icons_dir / f"{name}.svg"
-                    result = self._download_icon(name, namespace, svg_path, timeout, verbose)
-                    if result is True:
-                        total_downloaded += 1
-                    elif result is False:
-                        total_failed += 1
+                downloaded, failed = self._store_icons(
+                    icons_dir,
+                    namespace,
+                    names,
+                    fetched,
+                    etags_by_dir[icons_dir],
+                    writes,
+                    verbose,
+                    refresh,
+                )
+                total_downloaded += downloaded
+                total_failed += failed
+
+        self._flush(writes, etags_by_dir)
 
         # Summary
         self.stdout.write("")
@@ -410,6 +641,8 @@ which Django's staticfiles finders will discover automatically.
         dry_run = options["dry_run"]
         verbose = options["verbosity"] >= 2
         timeout = options["timeout"]
+        concurrency = options["concurrency"]
+        refresh = options["refresh"]
 
         output_dir = options["output"]
         if not output_dir:
@@ -449,13 +682,18 @@ which Django's staticfiles finders will discover automatically.
 
         self.stdout.write(self.style.MIGRATE_HEADING("\nDownloading icons..."))
 
+        targets = [
+            (output_path / namespace, namespace, names)
+            for namespace, names in grouped.items()
+            if namespace in CDN_TEMPLATES
+        ]
+        fetched, etags_by_dir = self._fetch_targets(targets, timeout, concurrency, refresh)
+
         total_downloaded = 0
         total_failed = 0
+        writes: list[tuple[Path, bytes]] = []
 
         for namespace, names in grouped.items():
-            namespace_dir = output_path / namespace
-            namespace_dir.mkdir(exist_ok=True)
-
             cdn_url = CDN_TEMPLATES.get(namespace)
             if not cdn_url:
                 self.stdout.write(
@@ -463,15 +701,24 @@ which Django's staticfiles finders will discover automatically.
                 )
                 continue
 
+            namespace_dir = output_path / namespace
+
             self.stdout.write(f"\n{namespace}: {len(names)} icons")
 
-            for name in sorted(names):
-                svg_path = namespace_dir / f"{name}.svg"
-                result = self._download_icon(name, namespace, svg_path, timeout, verbose)
-                if result is True:
-                    total_downloaded += 1
-                elif result is False:
-                    total_failed += 1
+            downloaded, failed = self._store_icons(
+                namespace_dir,
+                namespace,
+                names,
+                fetched,
+                etags_by_dir[namespace_dir],
+                writes,
+                verbose,
+                refresh,
+            )
+            total_downloaded += downloaded
+            total_failed += failed
+
+        self._flush(writes, etags_by_dir)
 
         self.stdout.write("")
         self.stdout.write(self.style.SUCCESS(f"Downloaded: {total_downloaded} icons"))
@@ -22,6 +22,8 @@ Usage:
     icon = icons.get("ion:home")
 """
 
+import os
+import zipfile
 from pathlib import Path
 
 PACKS_DIR = Path(__file__).parent
@@ -32,6 +34,31 @@ def get_pack_path(pack_name: str) -> Path:
     return PACKS_DIR / pack_name / "icons"
 
 
+def count_icons(icons_dir: Path) -> int:
+    """Count the SVG files in a directory without building Path objects."""
+    if not icons_dir.exists():
+        return 0
+    with os.scandir(icons_dir) as entries:
+        return sum(1 for entry in entries if entry.name.endswith(".svg"))
+
+
+def count_pack_icons(pack_dir: Path) -> int:
+    """
+    Count a pack's installed icons.
+
+    Counts the SVG entries of the pack's icons.zip bundle when there is one,
+    otherwise the SVG files in its icons/ directory.
+    """
+    bundle_file = pack_dir / "icons.zip"
+    if bundle_file.exists():
+        try:
+            with zipfile.ZipFile(bundle_file) as zf:
+                return sum(1 for name in zf.namelist() if name.endswith(".svg"))
+        except (OSError, zipfile.BadZipFile):
+            return 0
+    return count_icons(pack_dir / "icons")
+
+
 def list_available_packs() -> list[str]:
     """List all available packs."""
     packs = []
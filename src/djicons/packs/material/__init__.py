@@ -28,6 +28,7 @@ LICENSE = "Apache-2.0"
 HOMEPAGE = "https://fonts.google.com/icons"
 
 ICONS_DIR = Path(__file__).parent / "icons"
+BUNDLE_FILE = Path(__file__).parent / "icons.zip"
 
 
 def register(registry: "IconRegistry") -> None:
@@ -37,16 +38,20 @@ def register(registry: "IconRegistry") -> None:
     Args:
         registry: The icon registry to register with
     """
-    from ...loaders import DirectoryIconLoader
+    from ...loaders import DirectoryIconLoader, ZipIconLoader
 
-    if ICONS_DIR.exists():
+    if BUNDLE_FILE.exists():
+        registry.register_loader(ZipIconLoader(BUNDLE_FILE), namespace=NAMESPACE)
+    elif ICONS_DIR.exists():
         loader = DirectoryIconLoader(ICONS_DIR)
         registry.register_loader(loader, namespace=NAMESPACE)
 
 
 def get_metadata() -> dict:
     """Return pack metadata."""
-    icon_count = len(list(ICONS_DIR.glob("*.svg"))) if ICONS_DIR.exists() else 0
+    from .. import count_pack_icons
+
+    icon_count = count_pack_icons(Path(__file__).parent)
     return {
         "name": "Material Symbols",
         "namespace": NAMESPACE,
@@ -54,5 +59,5 @@ def get_metadata() -> dict:
         "license": LICENSE,
         "homepage": HOMEPAGE,
         "count": icon_count,
-        "installed": ICONS_DIR.exists() and icon_count > 0,
+        "installed": icon_count > 0,
     }
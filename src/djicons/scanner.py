@@ -5,150 +5,492 @@ Scans Django templates to find all icon usages and collect
 only the icons that are actually used in the project.
 """
 
+import bisect
+import functools
+import importlib.util
+import itertools
+import mmap
+import multiprocessing
+import os
 import re
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import Any, TypeVar
 
 from django.conf import settings
+from django.core.signals import setting_changed
+
+from .conf import get_setting
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None  # type: ignore[assignment, unused-ignore]
+
+_T = TypeVar("_T")
 
 # Regex patterns to match icon template tags
 # Matches: {% icon "name" %}, {% icon 'name' %}, {% icon "ns:name" %}
 ICON_PATTERN = re.compile(r'{%\s*icon\s+["\']([^"\']+)["\']', re.MULTILINE)
 
+# Same pattern for raw file bytes, so templates are scanned without decoding
+# Names never contain NUL, which lets batches of files be joined with it
+ICON_PATTERN_BYTES = re.compile(rb'{%\s*icon\s+["\']([^"\'\x00]+)["\']')
+
+# Hyperscan has no capture groups: it reports the span of each tag, and
+# ICON_PATTERN_BYTES then extracts the name from that span
+HYPERSCAN_PATTERN = rb'\{%\s*icon\s+["\'][^"\'\x00]+["\']'
+
+# Template file extensions scanned by default
+DEFAULT_EXTENSIONS = (".html", ".txt")
+
+# Size of the shortest possible tag; smaller files cannot use an icon
+MIN_TEMPLATE_BYTES = len(b'{%icon "x"')
+
+# Smaller templates are read in one syscall; mapping them costs more than reading
+MMAP_MIN_SIZE = 64 * 1024
+
+# Template reads are I/O-bound, so scan files on a thread pool
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Templates are matched in worker processes only when at least this many
+# uncached bytes need scanning; below it, process startup costs more than it saves
+PROCESS_SCAN_MIN_BYTES = 32 * 1024 * 1024
+
+# Each worker takes this many files and matches the small ones together,
+# joined with BATCH_SEPARATOR into buffers of up to BATCH_MAX_BYTES
+SCAN_BATCH_FILES = 64
+BATCH_MAX_BYTES = 4 * 1024 * 1024
+BATCH_SEPARATOR = b"\x00"
+
+# Icon names per template path, valid while (st_mtime_ns, st_size) match
+_FILE_CACHE: dict[str, tuple[int, int, frozenset[str]]] = {}
+
+
+def _compile_hyperscan() -> Any:
+    """Build the Hyperscan database, or return None to use the re module."""
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[HYPERSCAN_PATTERN],
+            ids=[0],
+            elements=1,
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST],
+        )
+    except Exception:
+        return None
+    return db
+
 
+_HYPERSCAN_DB = _compile_hyperscan()
+
+# Concurrent scans of one database each need their own scratch space, so
+# every thread keeps a clone of the database's scratch
+_HYPERSCAN_LOCAL = threading.local()
+
+
+def _thread_scratch(db: Any) -> Any:
+    """Return this thread's Hyperscan scratch space for db."""
+    local = _HYPERSCAN_LOCAL
+    if getattr(local, "db", None) is not db:
+        local.scratch = db.scratch.clone()
+        local.db = db
+    return local.scratch
+
+
+@functools.cache
 def get_template_dirs() -> list[Path]:
     """
     Get all template directories from Django settings.
 
+    The result is cached for the life of the process; call
+    reset_path_caches() if TEMPLATES or INSTALLED_APPS change.
+
     Returns:
         List of template directory paths
     """
-    template_dirs: list[Path] = []
+    return [path for path, _app_path in _iter_template_dirs() if path.exists()]
+
+
+def _iter_template_dirs() -> Iterator[tuple[Path, Path | None]]:
+    """
+    Yield (templates_path, app_path) for every configured template directory.
+
+    app_path is None for TEMPLATES DIRS entries and the app's package
+    directory for APP_DIRS entries. Existence is left to the caller.
+    """
+    installed_apps: list[str] | None = None
 
-    # Get from TEMPLATES setting
-    templates_config = getattr(settings, "TEMPLATES", [])
-    for config in templates_config:
+    for config in getattr(settings, "TEMPLATES", []):
         # DIRS from each template backend
         for dir_path in config.get("DIRS", []):
-            path = Path(dir_path)
-            if path.exists():
-                template_dirs.append(path)
+            yield Path(dir_path), None
 
-        # APP_DIRS: scan each installed app's templates folder
+        # APP_DIRS: each installed app's templates folder
         if config.get("APP_DIRS", False):
-            for app in settings.INSTALLED_APPS:
-                try:
-                    # Get app path
-                    module = __import__(app, fromlist=[""])
-                    app_path = Path(module.__file__).parent
-                    templates_path = app_path / "templates"
-                    if templates_path.exists():
-                        template_dirs.append(templates_path)
-                except (ImportError, AttributeError):
-                    pass
+            if installed_apps is None:
+                installed_apps = list(settings.INSTALLED_APPS)
+            for app in installed_apps:
+                app_path = _find_app_path(app)
+                if app_path is not None:
+                    yield app_path / "templates", app_path
 
-    return template_dirs
 
+def _find_app_path(app: str) -> Path | None:
+    """
+    Locate an installed app's package directory without importing it.
 
-def scan_file(file_path: Path) -> set[str]:
+    find_spec only imports the parent packages of a dotted name, so the
+    app's own module (and whatever it imports) is never executed.
+    """
+    try:
+        spec = importlib.util.find_spec(app)
+    except (ImportError, ValueError):
+        return None
+    if spec is None:
+        return None
+
+    # Packages, including namespace packages without __init__.py
+    if spec.submodule_search_locations:
+        return Path(next(iter(spec.submodule_search_locations)))
+    if spec.origin:
+        return Path(spec.origin).parent
+    return None
+
+
+def _read_and_match(path: str, size: int) -> frozenset[str]:
+    """Read a template of the given size and return the icon names in it."""
+    try:
+        # Unbuffered: the file is read whole, so a BufferedReader only adds a copy
+        with open(path, "rb", buffering=0) as f:
+            if size < MMAP_MIN_SIZE:
+                return _match_icons(f.readall())
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # mmap rejects empty files (the file shrank since stat)
+                return _match_icons(f.readall())
+            with buf:
+                return _match_icons(buf)
+    except OSError:
+        return frozenset()
+
+
+def _match_icons(buf: bytes | mmap.mmap) -> frozenset[str]:
+    """Extract icon names from a template buffer, skipping undecodable ones."""
+    # A substring search is far cheaper than the regex, and most templates
+    # contain no icon tag at all. mmap's "in" only tests single bytes, so
+    # use find() which works for both buffer types.
+    if buf.find(b"icon") < 0:
+        return frozenset()
+
+    icons = set()
+    for match in _iter_matches(buf):
+        try:
+            icons.add(match.group(1).decode("utf-8"))
+        except UnicodeDecodeError:
+            pass
+    return frozenset(icons)
+
+
+def _iter_matches(buf: bytes | mmap.mmap) -> Iterator[re.Match[bytes]]:
+    """Find icon tags with Hyperscan when installed, else with re."""
+    db = _HYPERSCAN_DB
+    if db is None:
+        yield from ICON_PATTERN_BYTES.finditer(buf)
+        return
+
+    spans: list[tuple[int, int]] = []
+
+    def on_match(pattern_id: int, start: int, end: int, flags: int, context: object) -> None:
+        spans.append((start, end))
+
+    db.scan(buf, match_event_handler=on_match, scratch=_thread_scratch(db))
+
+    for start, end in spans:
+        match = ICON_PATTERN_BYTES.match(buf, start, end)
+        if match is not None:
+            yield match
+
+
+def scan_file(file_path: str | Path) -> frozenset[str]:
     """
     Scan a single template file for icon usages.
 
+    Results are cached per path and checked against the file's mtime and
+    size, so rescanning an unchanged file skips both the read and the regex.
+
     Args:
         file_path: Path to the template file
 
     Returns:
-        Set of icon names found (with namespace if specified)
+        Frozen set of icon names found (with namespace if specified)
     """
-    icons = set()
+    return _scan_path(file_path)
 
+
+def _scan_path(file_path: str | Path) -> frozenset[str]:
+    """Stat a template and return its (possibly cached) icon names."""
+    path = os.fspath(file_path)
     try:
-        content = file_path.read_text(encoding="utf-8")
-        matches = ICON_PATTERN.findall(content)
-        icons.update(matches)
-    except (OSError, UnicodeDecodeError):
-        pass
+        st = os.stat(path)
+    except OSError:
+        return frozenset()
+    if st.st_size < MIN_TEMPLATE_BYTES:
+        return frozenset()
+
+    icons = _cached_icons(path, st)
+    if icons is None:
+        icons = _read_and_match(path, st.st_size)
+        _FILE_CACHE[path] = (st.st_mtime_ns, st.st_size, icons)
+    return icons
+
+
+def _cached_icons(path: str, st: os.stat_result) -> frozenset[str] | None:
+    """Return the cached icons for path if the file is unchanged."""
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    return None
+
+
+def _scan_paths(files: list[tuple[str, os.stat_result]]) -> set[str]:
+    """Scan several templates and return the union of their icon names."""
+    icons: set[str] = set()
+    for found in _iter_file_icons(files):
+        icons |= found
+    return icons
+
+
+def _scan_paths_grouped(
+    files: list[tuple[str, os.stat_result]], default_namespace: str
+) -> dict[str, set[str]]:
+    """Scan several templates, grouping each file's icons straight by namespace."""
+    grouped: dict[str, set[str]] = {}
+    for found in _iter_file_icons(files):
+        _group_into(found, default_namespace, grouped)
+    return grouped
+
 
+def _iter_file_icons(files: list[tuple[str, os.stat_result]]) -> Iterator[frozenset[str]]:
+    """
+    Yield the icon names of each template, matching the small uncached ones in one pass.
+
+    Small files that contain the "icon" literal are joined with
+    BATCH_SEPARATOR and matched together, which amortizes the per-call
+    regex overhead over many templates. Matches are attributed back to
+    their file so every template still gets its own cache entry.
+    """
+    chunks: list[bytes] = []
+    pending: list[tuple[str, os.stat_result]] = []
+    batch_size = 0
+
+    for path, st in files:
+        found = _cached_icons(path, st)
+        if found is None and st.st_size >= MMAP_MIN_SIZE:
+            found = _read_and_match(path, st.st_size)
+            _FILE_CACHE[path] = (st.st_mtime_ns, st.st_size, found)
+        if found is not None:
+            yield found
+            continue
+
+        try:
+            with open(path, "rb", buffering=0) as f:
+                data = f.readall()
+        except OSError:
+            continue
+        if data.find(b"icon") < 0:
+            _FILE_CACHE[path] = (st.st_mtime_ns, st.st_size, frozenset())
+            continue
+
+        chunks.append(data)
+        pending.append((path, st))
+        batch_size += len(data) + 1
+        if batch_size >= BATCH_MAX_BYTES:
+            yield from _match_batch(chunks, pending)
+            chunks, pending, batch_size = [], [], 0
+
+    if pending:
+        yield from _match_batch(chunks, pending)
+
+
+def _match_batch(
+    chunks: list[bytes], pending: list[tuple[str, os.stat_result]]
+) -> list[frozenset[str]]:
+    """Match joined template buffers and cache and return each file's icon names."""
+    starts = list(itertools.accumulate((len(c) + 1 for c in chunks[:-1]), initial=0))
+    per_file: list[set[str]] = [set() for _ in chunks]
+
+    for match in _iter_matches(BATCH_SEPARATOR.join(chunks)):
+        try:
+            name = match.group(1).decode("utf-8")
+        except UnicodeDecodeError:
+            continue
+        per_file[bisect.bisect_right(starts, match.start()) - 1].add(name)
+
+    icons: list[frozenset[str]] = []
+    for (path, st), found in zip(pending, per_file, strict=True):
+        frozen = frozenset(found)
+        _FILE_CACHE[path] = (st.st_mtime_ns, st.st_size, frozen)
+        icons.append(frozen)
     return icons
 
 
-def scan_directory(directory: Path, extensions: tuple[str, ...] = (".html", ".txt")) -> set[str]:
+def _chunked(items: Iterable[_T], size: int) -> Iterator[list[_T]]:
+    """Split items into lists of at most size items."""
+    it = iter(items)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def _walk_with_exts(
+    root: str | Path, exts: tuple[str, ...], max_bytes: int | None = None
+) -> Iterator[tuple[str, os.stat_result]]:
+    """
+    Yield (path, stat) for files under root whose name ends with one of exts.
+
+    Walks the tree once with os.scandir, relying on the cached dirent type
+    so directories and non-matching files cost no extra stat. Files too
+    small to hold an icon tag or larger than max_bytes are skipped.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(exts) and entry.is_file():
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        if st.st_size < MIN_TEMPLATE_BYTES:
+                            continue
+                        if max_bytes is not None and st.st_size > max_bytes:
+                            continue
+                        yield entry.path, st
+        except OSError:
+            continue
+
+
+def scan_directory(
+    directory: Path, extensions: Iterable[str] = DEFAULT_EXTENSIONS
+) -> frozenset[str]:
     """
     Scan a directory recursively for icon usages in templates.
 
+    Files larger than the MAX_TEMPLATE_BYTES setting are skipped.
+
     Args:
         directory: Directory to scan
         extensions: File extensions to scan
 
     Returns:
-        Set of icon names found
+        Frozen set of icon names found
     """
-    icons = set()
+    exts = extensions if isinstance(extensions, tuple) else tuple(extensions)
+    max_bytes = get_setting("MAX_TEMPLATE_BYTES")
+    icons: set[str] = set()
+    batches = _chunked(_walk_with_exts(directory, exts, max_bytes), SCAN_BATCH_FILES)
 
-    for ext in extensions:
-        for file_path in directory.rglob(f"*{ext}"):
-            icons.update(scan_file(file_path))
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        for found in executor.map(_scan_paths, batches):
+            icons |= found
 
-    return icons
+    return frozenset(icons)
 
 
-def scan_templates() -> set[str]:
+def scan_templates() -> frozenset[str]:
     """
     Scan all Django templates for icon usages.
 
+    A template directory listed more than once in the settings is only
+    walked once.
+
     Returns:
-        Set of all icon names used in templates
+        Frozen set of all icon names used in templates
     """
-    icons = set()
+    icons: set[str] = set()
+    scanned: set[str] = set()
 
     for template_dir in get_template_dirs():
-        icons.update(scan_directory(template_dir))
+        key = os.path.abspath(template_dir)
+        if key in scanned:
+            continue
+        scanned.add(key)
+        icons |= scan_directory(template_dir)
 
-    return icons
+    return frozenset(icons)
 
 
-def get_app_paths() -> list[tuple[Path, Path]]:
+@functools.cache
+def get_app_paths(resolve_symlinks: bool = False) -> list[tuple[Path, Path]]:
     """
     Get all Django app paths paired with their template directories.
 
+    Template directories are made absolute and normalized lexically, which
+    needs no filesystem access. Directories reached through different
+    symlinks are only recognized as the same with resolve_symlinks=True.
+
+    The result is cached for the life of the process; call
+    reset_path_caches() if TEMPLATES or INSTALLED_APPS change.
+
+    Args:
+        resolve_symlinks: Canonicalize template dirs with Path.resolve()
+
     Returns:
         List of (app_path, templates_path) tuples
     """
     app_entries: list[tuple[Path, Path]] = []
-    seen_templates: set[Path] = set()
+    # Template dirs already added, as strings for cheap hashing
+    seen_templates: set[str] = set()
 
-    templates_config = getattr(settings, "TEMPLATES", [])
-    for config in templates_config:
-        # DIRS entries — these are standalone template dirs (not app-bound)
-        # We include them mapped to themselves so they're still scanned
-        for dir_path in config.get("DIRS", []):
-            path = Path(dir_path).resolve()
-            if path.exists() and path not in seen_templates:
-                seen_templates.add(path)
-                # Try to find the app root: if this is an app's templates/ dir
-                if path.name == "templates" and (path.parent / "__init__.py").exists():
-                    app_entries.append((path.parent, path))
-                else:
-                    app_entries.append((path, path))
-
-        # APP_DIRS: each installed app's templates folder
-        if config.get("APP_DIRS", False):
-            for app in settings.INSTALLED_APPS:
-                try:
-                    module = __import__(app, fromlist=[""])
-                    app_path = Path(module.__file__).parent
-                    templates_path = (app_path / "templates").resolve()
-                    if templates_path.exists() and templates_path not in seen_templates:
-                        seen_templates.add(templates_path)
-                        app_entries.append((app_path, templates_path))
-                except (ImportError, AttributeError):
-                    pass
+    for templates_path, app_path in _iter_template_dirs():
+        if resolve_symlinks:
+            key = str(templates_path.resolve())
+        else:
+            key = os.path.abspath(templates_path)
+        path = Path(key)
+        if key in seen_templates or not path.exists():
+            continue
+        seen_templates.add(key)
+
+        if app_path is not None:
+            app_entries.append((app_path, path))
+        # DIRS entries are standalone template dirs (not app-bound), mapped to
+        # themselves so they're still scanned, unless this is an app's templates/ dir
+        elif path.name == "templates" and (path.parent / "__init__.py").exists():
+            app_entries.append((path.parent, path))
+        else:
+            app_entries.append((path, path))
 
     return app_entries
 
 
+def reset_path_caches() -> None:
+    """Forget the cached template directories and app paths."""
+    get_template_dirs.cache_clear()
+    get_app_paths.cache_clear()
+
+
+def _reset_path_caches(*, setting: str, **kwargs: Any) -> None:
+    """Drop cached template paths when the settings they derive from change."""
+    if setting in ("TEMPLATES", "INSTALLED_APPS"):
+        reset_path_caches()
+
+
+setting_changed.connect(_reset_path_caches)
+
+
 def scan_templates_per_app(
     default_namespace: str = "ion",
-) -> dict[Path, dict[str, set[str]]]:
+) -> dict[Path, dict[str, frozenset[str]]]:
     """
     Scan all Django templates and group icons per app.
 
@@ -161,28 +503,77 @@ def scan_templates_per_app(
         default_namespace: Default namespace for unqualified icon names
 
     Returns:
-        Dict mapping app_path to {namespace: set of icon names}
+        Dict mapping app_path to {namespace: frozen set of icon names}
     """
-    result: dict[Path, dict[str, set[str]]] = {}
-
-    for app_path, templates_path in get_app_paths():
-        icons = scan_directory(templates_path)
-        if not icons:
-            continue
+    max_bytes = get_setting("MAX_TEMPLATE_BYTES")
+    # Walk every app up front: the stats tell how much is left to scan
+    app_files = [
+        (app_path, list(_walk_with_exts(templates_path, DEFAULT_EXTENSIONS, max_bytes)))
+        for app_path, templates_path in get_app_paths()
+    ]
+    uncached = [
+        (path, st)
+        for _, files in app_files
+        for path, st in files
+        if _cached_icons(path, st) is None
+    ]
+    if sum(st.st_size for _, st in uncached) >= PROCESS_SCAN_MIN_BYTES:
+        _scan_in_processes(uncached)
+
+    # Keyed by the app path string, so template dirs of the same app merge;
+    # str hashes are cached
+    result: dict[str, dict[str, set[str]]] = {}
+
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        for app_path, files in app_files:
+            grouped = result.setdefault(str(app_path), {})
+            batches = _chunked(files, SCAN_BATCH_FILES)
+            # Each batch arrives grouped, so names are only ever partitioned
+            # once, as they come out of the per-file results
+            for found in executor.map(
+                _scan_paths_grouped, batches, itertools.repeat(default_namespace)
+            ):
+                for ns, names in found.items():
+                    if ns in grouped:
+                        grouped[ns] |= names
+                    else:
+                        grouped[ns] = names
+
+    return {
+        Path(k): {ns: frozenset(names) for ns, names in grouped.items()}
+        for k, grouped in result.items()
+        if grouped
+    }
+
+
+def _scan_in_processes(files: list[tuple[str, os.stat_result]]) -> None:
+    """
+    Match templates in worker processes, escaping the GIL for the regex.
 
-        grouped = group_icons_by_namespace(icons, default_namespace)
+    Each worker sends back its per-file results, which are stored in
+    _FILE_CACHE so the caller's scan finds them there. Workers are spawned
+    rather than forked, so they cannot inherit a lock held by another
+    thread. If a pool cannot be started, the files are left for the
+    caller to scan.
+    """
+    batches = list(_chunked(files, SCAN_BATCH_FILES))
+    workers = min(len(batches), os.cpu_count() or 1)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            for entries in pool.map(_scan_for_parent, batches):
+                _FILE_CACHE.update(entries)
+    except (OSError, BrokenProcessPool):
+        pass
 
-        if app_path in result:
-            # Merge with existing entry
-            for ns, names in grouped.items():
-                if ns in result[app_path]:
-                    result[app_path][ns].update(names)
-                else:
-                    result[app_path][ns] = names
-        else:
-            result[app_path] = grouped
 
-    return result
+def _scan_for_parent(
+    files: list[tuple[str, os.stat_result]],
+) -> list[tuple[str, tuple[int, int, frozenset[str]]]]:
+    """Scan templates in a worker process and return their cache entries."""
+    _scan_paths(files)
+    return [(path, _FILE_CACHE[path]) for path, _ in files if path in _FILE_CACHE]
 
 
 def parse_icon_name(name: str, default_namespace: str = "ion") -> tuple[str, str]:
@@ -196,31 +587,35 @@ def parse_icon_name(name: str, default_namespace: str = "ion") -> tuple[str, str
     Returns:
         Tuple of (namespace, icon_name)
     """
-    if ":" in name:
-        namespace, icon_name = name.split(":", 1)
+    namespace, sep, icon_name = name.partition(":")
+    if sep:
         return namespace, icon_name
     return default_namespace, name
 
 
 def group_icons_by_namespace(
-    icons: set[str], default_namespace: str = "ion"
+    icons: Iterable[str], default_namespace: str = "ion"
 ) -> dict[str, set[str]]:
     """
     Group icon names by namespace.
 
     Args:
-        icons: Set of icon names
+        icons: Icon names, e.g. the frozenset returned by scan_templates()
         default_namespace: Default namespace for unqualified names
 
     Returns:
         Dictionary mapping namespace to set of icon names
     """
     grouped: dict[str, set[str]] = {}
+    _group_into(icons, default_namespace, grouped)
+    return grouped
 
-    for icon in icons:
-        namespace, name = parse_icon_name(icon, default_namespace)
-        if namespace not in grouped:
-            grouped[namespace] = set()
-        grouped[namespace].add(name)
 
-    return grouped
+def _group_into(icons: Iterable[str], default_namespace: str, out: dict[str, set[str]]) -> None:
+    """Add icon names to a namespace grouping in place."""
+    for icon in icons:
+        # Inlined parse_icon_name: this runs once per icon
+        namespace, sep, name = icon.partition(":")
+        if not sep:
+            namespace, name = default_namespace, icon
+        out.setdefault(namespace, set()).add(name)
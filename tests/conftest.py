@@ -1,6 +1,7 @@
 """Pytest configuration and fixtures."""
 
 import tempfile
+import zipfile
 from pathlib import Path
 
 import pytest
@@ -36,6 +37,18 @@ def icons_dir(sample_svg):
         yield icons_path
 
 
+@pytest.fixture
+def icons_zip(sample_svg, tmp_path):
+    """Create a zip bundle with sample icons."""
+    zip_path = tmp_path / "icons.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("home.svg", sample_svg)
+        zf.writestr("cart.svg", sample_svg.replace("M10", "M15"))
+        zf.writestr("nested/settings.svg", sample_svg.replace("M10", "M20"))
+        zf.writestr("README.md", "not an icon")
+    return zip_path
+
+
 @pytest.fixture
 def fresh_registry():
     """Get a fresh registry instance for testing."""
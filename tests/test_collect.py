@@ -0,0 +1,318 @@
+"""Tests for the djicons_collect management command."""
+
+import io
+import threading
+from urllib.error import HTTPError
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from djicons.management.commands import djicons_collect
+
+
+class FakeResponse(io.BytesIO):
+    """Minimal stand-in for the object returned by urlopen."""
+
+    def __init__(self, data, headers=None):
+        super().__init__(data)
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@pytest.fixture
+def fake_cdn(monkeypatch):
+    """
+    Serve every icon from a fake CDN, except names starting with 'missing'.
+
+    Each icon's ETag is its file name; matching If-None-Match requests get a 304.
+    """
+    requested = []
+
+    def fake_urlopen(request, timeout=None):
+        url = request.full_url
+        requested.append(url)
+        name = url.rsplit("/", 1)[-1]
+        if name.startswith("missing"):
+            raise HTTPError(url, 404, "Not Found", {}, None)
+        etag = f'"{name}"'
+        if request.get_header("If-none-match") == etag:
+            raise HTTPError(url, 304, "Not Modified", {}, None)
+        return FakeResponse(f"<svg>{name}</svg>".encode(), {"ETag": etag})
+
+    monkeypatch.setattr(djicons_collect, "urlopen", fake_urlopen)
+    return requested
+
+
+class TestDownloadRetries:
+    """Tests for retrying transient CDN failures."""
+
+    @pytest.fixture
+    def flaky_cdn(self, monkeypatch):
+        """Fail each URL with the queued errors before serving it."""
+        monkeypatch.setattr(djicons_collect, "RETRY_BACKOFF", 0)
+        errors = []
+        calls = []
+
+        def fake_urlopen(request, timeout=None):
+            calls.append(request.full_url)
+            if errors:
+                raise errors.pop(0)
+            return FakeResponse(b"<svg></svg>")
+
+        monkeypatch.setattr(djicons_collect, "urlopen", fake_urlopen)
+        return errors, calls
+
+    def test_retries_server_errors(self, flaky_cdn):
+        """Should retry 5xx responses and dropped connections."""
+        errors, calls = flaky_cdn
+        errors += [
+            HTTPError("u", 503, "Unavailable", {}, None),
+            ConnectionResetError("reset"),
+        ]
+
+        content, error = djicons_collect.Command()._download_icon_content("home", "ion", 1)
+
+        assert content == "<svg></svg>"
+        assert error is None
+        assert len(calls) == 3
+
+    def test_gives_up_after_max_retries(self, flaky_cdn):
+        """Should report the error once retries are exhausted."""
+        errors, calls = flaky_cdn
+        errors += [HTTPError("u", 502, "Bad Gateway", {}, None)] * 10
+
+        content, error = djicons_collect.Command()._download_icon_content("home", "ion", 1)
+
+        assert content is None
+        assert error == "[HTTP 502] home"
+        assert len(calls) == djicons_collect.MAX_RETRIES + 1
+
+    def test_does_not_retry_client_errors(self, flaky_cdn):
+        """Should not retry 4xx responses other than 429."""
+        errors, calls = flaky_cdn
+        errors.append(HTTPError("u", 403, "Forbidden", {}, None))
+
+        content, error = djicons_collect.Command()._download_icon_content("home", "ion", 1)
+
+        assert error == "[HTTP 403] home"
+        assert len(calls) == 1
+
+    def test_retry_after_header(self):
+        """Should honor numeric Retry-After values, capped at the maximum."""
+        assert djicons_collect._retry_delay(0, "2") == 2.0
+        assert djicons_collect._retry_delay(0, "3600") == djicons_collect.MAX_RETRY_DELAY
+
+
+class TestCollectPerApp:
+    """Tests for per-app collect mode."""
+
+    def test_downloads_into_app_static(self, tmp_path, monkeypatch, fake_cdn):
+        """Should write each app's icons into its static/icons/{namespace}/."""
+        app_path = tmp_path / "shop"
+        monkeypatch.setattr(
+            djicons_collect,
+            "scan_templates_per_app",
+            lambda default_namespace: {app_path: {"ion": {"home", "cart"}}},
+        )
+
+        call_command("djicons_collect", stdout=io.StringIO())
+
+        icons_dir = app_path / "static" / "icons" / "ion"
+        assert sorted(p.name for p in icons_dir.glob("*.svg")) == ["cart.svg", "home.svg"]
+        assert (icons_dir / "home.svg").read_text() == "<svg>home.svg</svg>"
+        assert len(fake_cdn) == 2
+
+    def test_shared_icons_fetched_once(self, tmp_path, monkeypatch, fake_cdn):
+        """Should download an icon used by several apps only once."""
+        shop, blog = tmp_path / "shop", tmp_path / "blog"
+        monkeypatch.setattr(
+            djicons_collect,
+            "scan_templates_per_app",
+            lambda default_namespace: {shop: {"ion": {"home"}}, blog: {"ion": {"home"}}},
+        )
+
+        call_command("djicons_collect", stdout=io.StringIO())
+
+        assert (shop / "static" / "icons" / "ion" / "home.svg").exists()
+        assert (blog / "static" / "icons" / "ion" / "home.svg").exists()
+        assert len(fake_cdn) == 1
+
+    def test_reports_failures(self, tmp_path, monkeypatch, fake_cdn):
+        """Should count icons the CDN does not have as failed."""
+        app_path = tmp_path / "shop"
+        monkeypatch.setattr(
+            djicons_collect,
+            "scan_templates_per_app",
+            lambda default_namespace: {app_path: {"ion": {"home", "missing-icon"}}},
+        )
+        out = io.StringIO()
+
+        call_command("djicons_collect", stdout=out)
+
+        assert "Failed: 1 icons" in out.getvalue()
+        assert (app_path / "static" / "icons" / "ion" / "home.svg").exists()
+
+    def test_reports_failures_sorted(self, tmp_path, monkeypatch, fake_cdn):
+        """Should list failed icons in name order at default verbosity."""
+        app_path = tmp_path / "shop"
+        names = {f"missing-{c}" for c in "qwertyuiop"}
+        monkeypatch.setattr(
+            djicons_collect,
+            "scan_templates_per_app",
+            lambda default_namespace: {app_path: {"ion": names}},
+        )
+        out = io.StringIO()
+
+        call_command("djicons_collect", stdout=out)
+
+        reported = [
+            line.split()[-1] for line in out.getvalue().splitlines() if "[NOT FOUND]" in line
+        ]
+        assert reported == sorted(names)
+
+
+class TestConcurrencyOption:
+    """Tests for validating --concurrency."""
+
+    @pytest.mark.parametrize("value", ["0", "-2"])
+    def test_rejects_non_positive(self, value, fake_cdn):
+        """Should refuse a concurrency below 1 instead of hanging or crashing."""
+        with pytest.raises(CommandError, match="--concurrency"):
+            call_command("djicons_collect", "--concurrency", value, stdout=io.StringIO())
+
+        assert fake_cdn == []
+
+    def test_honors_concurrency(self, tmp_path, monkeypatch):
+        """Should keep exactly --concurrency requests in flight, even above 32."""
+        concurrency = 40
+        names = {f"icon-{i}" for i in range(concurrency * 2)}
+        monkeypatch.setattr(djicons_collect, "scan_templates", lambda: names)
+        lock = threading.Lock()
+        # Every request waits until `concurrency` of them are in flight together
+        barrier = threading.Barrier(concurrency, timeout=10)
+        in_flight = 0
+        peak = 0
+
+        def fake_urlopen(request, timeout=None):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            try:
+                barrier.wait()
+            finally:
+                with lock:
+                    in_flight -= 1
+            return FakeResponse(b"<svg></svg>")
+
+        monkeypatch.setattr(djicons_collect, "urlopen", fake_urlopen)
+        output = tmp_path / "icons"
+
+        call_command(
+            "djicons_collect",
+            "--central",
+            "--output",
+            str(output),
+            "--concurrency",
+            str(concurrency),
+            stdout=io.StringIO(),
+        )
+
+        assert peak == concurrency
+        assert len(list((output / "ion").glob("*.svg"))) == len(names)
+
+
+class TestCollectCentral:
+    """Tests for central collect mode."""
+
+    def test_downloads_into_output_dir(self, tmp_path, monkeypatch, fake_cdn):
+        """Should group downloaded icons by namespace under the output dir."""
+        monkeypatch.setattr(djicons_collect, "scan_templates", lambda: {"home", "hero:pencil"})
+        output = tmp_path / "icons"
+
+        call_command("djicons_collect", "--central", "--output", str(output), stdout=io.StringIO())
+
+        assert (output / "ion" / "home.svg").exists()
+        assert (output / "hero" / "pencil.svg").exists()
+
+    def test_skips_existing_icons(self, tmp_path, monkeypatch, fake_cdn):
+        """Should not re-download icons that already exist on disk."""
+        monkeypatch.setattr(djicons_collect, "scan_templates", lambda: {"home"})
+        output = tmp_path / "icons"
+        (output / "ion").mkdir(parents=True)
+        (output / "ion" / "home.svg").write_text("<svg>cached</svg>")
+
+        call_command("djicons_collect", "--central", "--output", str(output), stdout=io.StringIO())
+
+        assert fake_cdn == []
+        assert (output / "ion" / "home.svg").read_text() == "<svg>cached</svg>"
+
+
+class TestCollectRefresh:
+    """Tests for ETag revalidation with --refresh."""
+
+    def test_records_etags(self, tmp_path, monkeypatch, fake_cdn):
+        """Should store the ETag of each downloaded icon in a sidecar file."""
+        monkeypatch.setattr(djicons_collect, "scan_templates", lambda: {"home"})
+        output = tmp_path / "icons"
+
+        call_command("djicons_collect", "--central", "--output", str(output), stdout=io.StringIO())
+
+        etags = djicons_collect._load_etags(output / "ion")
+        assert etags == {"home": '"home.svg"'}
+
+    def test_refresh_unchanged_icon(self, tmp_path, monkeypatch, fake_cdn):
+        """Should keep existing icons the CDN reports as not modified."""
+        monkeypatch.setattr(djicons_collect, "scan_templates", lambda: {"home"})
+        output = tmp_path / "icons"
+        args = ("djicons_collect", "--central", "--output", str(output))
+        call_command(*args, stdout=io.StringIO())
+        (output / "ion" / "home.svg").write_text("<svg>local</svg>")
+
+        call_command(*args, "--refresh", stdout=io.StringIO())
+
+        assert len(fake_cdn) == 2
+        assert (output / "ion" / "home.svg").read_text() == "<svg>local</svg>"
+
+    @pytest.mark.parametrize("content", ["[]", '"etag"', '{"home": 1}'])
+    def test_ignores_malformed_etags_file(self, tmp_path, monkeypatch, fake_cdn, content):
+        """Should treat a sidecar that is not a name-to-ETag object as empty."""
+        monkeypatch.setattr(djicons_collect, "scan_templates", lambda: {"home"})
+        output = tmp_path / "icons"
+        (output / "ion").mkdir(parents=True)
+        (output / "ion" / "home.svg").write_text("<svg>stale</svg>")
+        (output / "ion" / djicons_collect.ETAGS_FILE).write_text(content)
+
+        call_command(
+            "djicons_collect",
+            "--central",
+            "--output",
+            str(output),
+            "--refresh",
+            stdout=io.StringIO(),
+        )
+
+        assert (output / "ion" / "home.svg").read_text() == "<svg>home.svg</svg>"
+        assert djicons_collect._load_etags(output / "ion") == {"home": '"home.svg"'}
+
+    def test_refresh_without_etag_redownloads(self, tmp_path, monkeypatch, fake_cdn):
+        """Should overwrite existing icons that have no recorded ETag."""
+        app_path = tmp_path / "shop"
+        monkeypatch.setattr(
+            djicons_collect,
+            "scan_templates_per_app",
+            lambda default_namespace: {app_path: {"ion": {"home"}}},
+        )
+        icons_dir = app_path / "static" / "icons" / "ion"
+        icons_dir.mkdir(parents=True)
+        (icons_dir / "home.svg").write_text("<svg>stale</svg>")
+
+        call_command("djicons_collect", "--refresh", stdout=io.StringIO())
+
+        assert (icons_dir / "home.svg").read_text() == "<svg>home.svg</svg>"
+        assert djicons_collect._load_etags(icons_dir) == {"home": '"home.svg"'}
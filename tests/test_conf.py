@@ -0,0 +1,36 @@
+"""Tests for djicons settings access."""
+
+from django.test import override_settings
+
+from djicons.conf import _CACHE, DEFAULTS, get_setting
+
+
+class TestGetSetting:
+    """Tests for get_setting function."""
+
+    def test_reads_djicons_dict(self):
+        """Should read values from the DJICONS dict."""
+        assert get_setting("DEFAULT_NAMESPACE") == "ion"
+
+    def test_falls_back_to_default(self):
+        """Should return the default for unset settings."""
+        assert get_setting("CACHE_TIMEOUT") == DEFAULTS["CACHE_TIMEOUT"]
+
+    def test_caches_value(self):
+        """Should memoize resolved settings."""
+        get_setting("DEFAULT_NAMESPACE")
+        assert _CACHE["DEFAULT_NAMESPACE"] == "ion"
+
+    def test_override_djicons_dict(self):
+        """Should pick up DJICONS changes made with override_settings."""
+        assert get_setting("DEFAULT_NAMESPACE") == "ion"
+
+        with override_settings(DJICONS={"DEFAULT_NAMESPACE": "hero"}):
+            assert get_setting("DEFAULT_NAMESPACE") == "hero"
+
+        assert get_setting("DEFAULT_NAMESPACE") == "ion"
+
+    def test_override_individual_setting(self):
+        """Should pick up DJICONS_* changes made with override_settings."""
+        with override_settings(DJICONS={}, DJICONS_DEFAULT_SIZE=32):
+            assert get_setting("DEFAULT_SIZE") == 32
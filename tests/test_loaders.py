@@ -2,7 +2,7 @@
 
 import pytest
 
-from djicons.loaders import BaseIconLoader, DirectoryIconLoader
+from djicons.loaders import BaseIconLoader, DirectoryIconLoader, ZipIconLoader
 
 
 class TestDirectoryIconLoader:
@@ -73,6 +73,69 @@ class TestDirectoryIconLoader:
         assert str(icons_dir) in repr(loader)
 
 
+class TestZipIconLoader:
+    """Test ZipIconLoader functionality."""
+
+    def test_load_icon(self, icons_zip):
+        """Should load icon from zip bundle."""
+        loader = ZipIconLoader(icons_zip)
+        svg = loader.load("home")
+
+        assert svg is not None
+        assert "<svg" in svg
+
+    def test_load_nested_icon(self, icons_zip):
+        """Should match entries by file name regardless of folder."""
+        loader = ZipIconLoader(icons_zip)
+
+        assert loader.load("settings") is not None
+
+    def test_load_nonexistent(self, icons_zip):
+        """Should return None for nonexistent icon."""
+        loader = ZipIconLoader(icons_zip)
+
+        assert loader.load("nonexistent") is None
+
+    def test_list_icons(self, icons_zip):
+        """Should list only SVG entries."""
+        loader = ZipIconLoader(icons_zip)
+
+        assert loader.list() == ["cart", "home", "settings"]
+
+    def test_caching(self, icons_zip):
+        """Should cache loaded icons."""
+        loader = ZipIconLoader(icons_zip)
+
+        svg1 = loader.load("home")
+        svg2 = loader.load("home")
+
+        assert svg1 is svg2  # Same object from cache
+
+    def test_clear_cache(self, icons_zip):
+        """Should clear cache and close the archive."""
+        loader = ZipIconLoader(icons_zip)
+
+        loader.load("home")
+        loader.clear_cache()
+
+        assert "home" not in loader._cache
+        assert loader._zipfile is None
+        assert loader.load("home") is not None
+
+    def test_missing_archive(self, tmp_path):
+        """Should handle a missing archive."""
+        loader = ZipIconLoader(tmp_path / "missing.zip")
+
+        assert loader.list() == []
+        assert loader.load("anything") is None
+
+    def test_repr(self, icons_zip):
+        """Should have debug representation."""
+        loader = ZipIconLoader(icons_zip)
+
+        assert "ZipIconLoader" in repr(loader)
+
+
 class TestBaseIconLoader:
     """Test BaseIconLoader abstract class."""
 
@@ -0,0 +1,38 @@
+"""Tests for built-in icon pack helpers."""
+
+import zipfile
+
+from djicons.packs import count_pack_icons
+
+
+class TestCountPackIcons:
+    """Tests for count_pack_icons function."""
+
+    def test_counts_icons_directory(self, tmp_path):
+        """Should count SVG files in the pack's icons/ directory."""
+        (tmp_path / "icons").mkdir()
+        (tmp_path / "icons" / "home.svg").write_text("<svg></svg>")
+        (tmp_path / "icons" / "cart.svg").write_text("<svg></svg>")
+        (tmp_path / "icons" / ".gitkeep").touch()
+
+        assert count_pack_icons(tmp_path) == 2
+
+    def test_prefers_bundle(self, tmp_path):
+        """Should count the entries of icons.zip when the pack is bundled."""
+        (tmp_path / "icons").mkdir()
+        (tmp_path / "icons" / "home.svg").write_text("<svg></svg>")
+        with zipfile.ZipFile(tmp_path / "icons.zip", "w") as zf:
+            for name in ("home.svg", "cart.svg", "star.svg"):
+                zf.writestr(name, "<svg></svg>")
+
+        assert count_pack_icons(tmp_path) == 3
+
+    def test_not_installed(self, tmp_path):
+        """Should return 0 for a pack with neither bundle nor icons."""
+        assert count_pack_icons(tmp_path) == 0
+
+    def test_corrupt_bundle(self, tmp_path):
+        """Should return 0 for an unreadable bundle."""
+        (tmp_path / "icons.zip").write_bytes(b"not a zip")
+
+        assert count_pack_icons(tmp_path) == 0
@@ -1,14 +1,24 @@
 """Tests for template scanner."""
 
+import re
 import tempfile
+import threading
 from pathlib import Path
 
+import pytest
+from django.test import override_settings
+
+from djicons import scanner
 from djicons.scanner import (
     ICON_PATTERN,
+    get_app_paths,
+    get_template_dirs,
     group_icons_by_namespace,
     parse_icon_name,
     scan_directory,
     scan_file,
+    scan_templates,
+    scan_templates_per_app,
 )
 
 
@@ -50,6 +60,86 @@ class TestIconPattern:
         assert set(matches) == {"home", "cart-outline", "hero:pencil"}
 
 
+class FakeScratch:
+    """Stand-in for hyperscan.Scratch."""
+
+    def clone(self):
+        return FakeScratch()
+
+
+class FakeHyperscanDatabase:
+    """Report tag spans the way a compiled Hyperscan database would."""
+
+    def __init__(self):
+        self.scratch = FakeScratch()
+        self.scratches = []
+
+    def scan(self, data, match_event_handler, scratch=None):
+        self.scratches.append(scratch)
+        for match in re.finditer(scanner.HYPERSCAN_PATTERN, data):
+            match_event_handler(0, match.start(), match.end(), 0, None)
+
+
+requires_hyperscan = pytest.mark.skipif(
+    scanner.hyperscan is None, reason="hyperscan is not installed"
+)
+
+
+class TestHyperscanMatching:
+    """Tests for scanning with an optional Hyperscan database."""
+
+    def test_extracts_names_from_spans(self, tmp_path, monkeypatch):
+        """Should turn reported tag spans into icon names."""
+        monkeypatch.setattr(scanner, "_HYPERSCAN_DB", FakeHyperscanDatabase())
+        template = tmp_path / "page.html"
+        template.write_text("{% icon \"home\" %}<p>icon</p>{%icon 'hero:pencil' %}")
+
+        assert scan_file(template) == {"home", "hero:pencil"}
+
+    def test_scratch_per_thread(self, tmp_path, monkeypatch):
+        """Should scan with one scratch space per thread instead of sharing one."""
+        db = FakeHyperscanDatabase()
+        monkeypatch.setattr(scanner, "_HYPERSCAN_DB", db)
+        templates = []
+        for i in range(2):
+            templates.append(tmp_path / f"page{i}.html")
+            templates[-1].write_text(f'{{% icon "icon-{i}" %}}')
+
+        scan_file(templates[0])
+        thread = threading.Thread(target=scan_file, args=(templates[1],))
+        thread.start()
+        thread.join()
+        templates[0].write_text('{% icon "home" %}')
+        scan_file(templates[0])
+
+        first, other, again = db.scratches
+        assert first is again
+        assert first is not other
+        assert db.scratch not in db.scratches
+
+    @requires_hyperscan
+    def test_real_database_small_and_mapped_files(self, tmp_path):
+        """Should match through the Hyperscan binding on bytes and mmap buffers."""
+        assert scanner._HYPERSCAN_DB is not None
+        small = tmp_path / "small.html"
+        small.write_text('{% icon "home" %}')
+        large = tmp_path / "large.html"
+        large.write_text("x" * scanner.MMAP_MIN_SIZE + "{% icon 'hero:pencil' %}")
+
+        assert scan_file(small) == {"home"}
+        assert scan_file(large) == {"hero:pencil"}
+
+    @requires_hyperscan
+    def test_real_database_concurrent_scans(self, tmp_path, monkeypatch):
+        """Should give every file its own names when threads scan concurrently."""
+        monkeypatch.setattr(scanner, "SCAN_BATCH_FILES", 1)
+        names = {f"icon-{i}" for i in range(200)}
+        for name in names:
+            (tmp_path / f"{name}.html").write_text(f'{{% icon "{name}" %}}')
+
+        assert scan_directory(tmp_path) == names
+
+
 class TestScanFile:
     """Tests for scan_file function."""
 
@@ -64,6 +154,7 @@ class TestScanFile:
 
             icons = scan_file(Path(f.name))
             assert icons == {"home", "cart"}
+            assert isinstance(icons, frozenset)
 
     def test_scan_file_empty(self):
         """Test scanning a file with no icons."""
@@ -74,6 +165,34 @@ class TestScanFile:
             icons = scan_file(Path(f.name))
             assert icons == set()
 
+    def test_scan_file_sees_edits(self, tmp_path):
+        """Should rescan a file after it changes despite the result cache."""
+        template = tmp_path / "page.html"
+        template.write_text('{% icon "home" %}')
+        assert scan_file(template) == {"home"}
+
+        template.write_text('{% icon "home" %}{% icon "cart" %}')
+        assert scan_file(template) == {"home", "cart"}
+
+    def test_scan_zero_byte_file(self, tmp_path):
+        """Should handle empty files, which cannot be memory-mapped."""
+        template = tmp_path / "empty.html"
+        template.touch()
+        assert scan_file(template) == set()
+
+    def test_scan_large_file(self, tmp_path):
+        """Should scan templates above the mmap threshold."""
+        template = tmp_path / "big.html"
+        padding = "x" * scanner.MMAP_MIN_SIZE
+        template.write_text(f'{padding}{{% icon "home" %}}{padding}')
+        assert scan_file(template) == {"home"}
+
+    def test_scan_non_ascii_file(self, tmp_path):
+        """Should find icons in templates containing non-ASCII text."""
+        template = tmp_path / "page.html"
+        template.write_text('<p>Café</p>{% icon "home" %}', encoding="utf-8")
+        assert scan_file(template) == {"home"}
+
     def test_scan_nonexistent_file(self):
         """Test scanning a nonexistent file returns empty set."""
         icons = scan_file(Path("/nonexistent/file.html"))
@@ -110,6 +229,268 @@ class TestScanDirectory:
             icons = scan_directory(tmppath)
             assert icons == {"home", "menu"}
 
+    def test_scan_directory_multiple_extensions(self, tmp_path):
+        """Should match every requested extension in a single walk."""
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "page.html").write_text('{% icon "home" %}')
+        (tmp_path / "nested" / "mail.txt").write_text('{% icon "mail" %}')
+        (tmp_path / "nested" / "script.js").write_text('{% icon "skipped" %}')
+
+        assert scan_directory(tmp_path) == {"home", "mail"}
+
+    def test_scan_directory_compound_extension(self, tmp_path):
+        """Should match extensions containing more than one dot."""
+        (tmp_path / "email.txt.j2").write_text('{% icon "mail" %}')
+        (tmp_path / "notes.j2").write_text('{% icon "skipped" %}')
+
+        assert scan_directory(tmp_path, extensions=(".txt.j2",)) == {"mail"}
+
+    def test_scan_directory_batches_attribute_matches(self, tmp_path, monkeypatch):
+        """Should attribute batched matches to the file they came from."""
+        monkeypatch.setattr(scanner, "BATCH_MAX_BYTES", 64)
+        for i in range(10):
+            (tmp_path / f"page{i}.html").write_text(f'<p>{{% icon "icon-{i}" %}}</p>')
+
+        assert scan_directory(tmp_path) == {f"icon-{i}" for i in range(10)}
+        assert scan_file(tmp_path / "page3.html") == {"icon-3"}
+
+    def test_scan_directory_tag_does_not_span_files(self, tmp_path):
+        """Should not join an unterminated tag with the next batched file."""
+        (tmp_path / "a.html").write_text('{% icon "broken')
+        (tmp_path / "b.html").write_text('icon" %}')
+
+        assert scan_directory(tmp_path) == set()
+
+    def test_scan_directory_extensions_list(self, tmp_path):
+        """Should accept extensions given as a list."""
+        (tmp_path / "page.html").write_text('{% icon "home" %}')
+        (tmp_path / "mail.txt").write_text('{% icon "mail" %}')
+
+        assert scan_directory(tmp_path, extensions=[".txt"]) == {"mail"}
+
+    def test_scan_directory_skips_oversized_files(self, tmp_path):
+        """Should skip templates larger than MAX_TEMPLATE_BYTES."""
+        (tmp_path / "page.html").write_text('{% icon "home" %}')
+        (tmp_path / "huge.html").write_text('{% icon "cart" %}' + "x" * 100)
+
+        with override_settings(DJICONS={"MAX_TEMPLATE_BYTES": 50}):
+            assert scan_directory(tmp_path) == {"home"}
+
+    def test_scan_directory_sees_new_files(self, tmp_path):
+        """Should pick up templates added since the previous scan."""
+        (tmp_path / "page.html").write_text('{% icon "home" %}')
+        assert scan_directory(tmp_path) == {"home"}
+
+        (tmp_path / "other.html").write_text('{% icon "cart" %}')
+        assert scan_directory(tmp_path) == {"home", "cart"}
+
+    def test_scan_missing_directory(self, tmp_path):
+        """Should return an empty set for a directory that does not exist."""
+        assert scan_directory(tmp_path / "missing") == set()
+
+
+def templates_setting(*dirs):
+    """Build a TEMPLATES setting using the given DIRS and no app dirs."""
+    return [
+        {
+            "BACKEND": "django.template.backends.django.DjangoTemplates",
+            "DIRS": [str(d) for d in dirs],
+            "APP_DIRS": False,
+        }
+    ]
+
+
+class TestTemplatePaths:
+    """Tests for get_template_dirs and get_app_paths."""
+
+    def test_caches_result(self):
+        """Should return the same cached list on repeated calls."""
+        assert get_template_dirs() is get_template_dirs()
+        assert get_app_paths() is get_app_paths()
+
+    def test_app_dirs_and_dirs(self, tmp_path):
+        """Should list DIRS entries and installed apps' templates dirs."""
+        import django.contrib.auth
+
+        auth_path = Path(django.contrib.auth.__file__).parent
+        setting = templates_setting(tmp_path)
+        setting[0]["APP_DIRS"] = True
+
+        with override_settings(TEMPLATES=setting):
+            assert get_template_dirs() == [tmp_path, auth_path / "templates"]
+            assert get_app_paths() == [
+                (tmp_path, tmp_path),
+                (auth_path, auth_path / "templates"),
+            ]
+
+    def test_app_dirs_namespace_package(self, tmp_path, monkeypatch):
+        """Should find templates of apps that are namespace packages."""
+        app_path = tmp_path / "nsapp"
+        (app_path / "templates").mkdir(parents=True)
+        monkeypatch.syspath_prepend(str(tmp_path))
+        setting = templates_setting()
+        setting[0]["APP_DIRS"] = True
+
+        with override_settings(TEMPLATES=setting, INSTALLED_APPS=["nsapp"]):
+            assert get_template_dirs() == [app_path / "templates"]
+
+    def test_find_app_path(self):
+        """Should locate app packages and skip entries that cannot be found."""
+        import django.contrib.auth
+
+        auth_path = Path(django.contrib.auth.__file__).parent
+        assert scanner._find_app_path("django.contrib.auth") == auth_path
+        assert scanner._find_app_path("does.not.exist") is None
+        assert scanner._find_app_path("django.contrib.auth.apps.AuthConfig") is None
+
+    def test_symlinked_dirs(self, tmp_path):
+        """Should only merge symlinked template dirs when resolving symlinks."""
+        real = tmp_path / "real"
+        real.mkdir()
+        (tmp_path / "link").symlink_to(real)
+
+        with override_settings(TEMPLATES=templates_setting(real, tmp_path / "link")):
+            assert len(get_app_paths()) == 2
+            assert get_app_paths(resolve_symlinks=True) == [(real.resolve(), real.resolve())]
+
+    def test_normalizes_dirs(self, tmp_path):
+        """Should treat lexically equivalent DIRS entries as one directory."""
+        with override_settings(TEMPLATES=templates_setting(tmp_path, f"{tmp_path}/./x/..")):
+            assert get_app_paths() == [(tmp_path, tmp_path)]
+
+    def test_settings_change_resets_cache(self, tmp_path):
+        """Should recompute paths when TEMPLATES is overridden."""
+        get_app_paths()
+
+        with override_settings(TEMPLATES=templates_setting(tmp_path)):
+            assert get_template_dirs() == [tmp_path]
+            assert get_app_paths() == [(tmp_path, tmp_path)]
+
+        assert (tmp_path, tmp_path) not in get_app_paths()
+
+
+class TestScanTemplates:
+    """Tests for scan_templates function."""
+
+    def test_walks_repeated_dir_once(self, tmp_path, monkeypatch):
+        """Should scan a template dir listed twice only once per call."""
+        (tmp_path / "page.html").write_text('{% icon "home" %}{% icon "hero:pencil" %}')
+        walked = []
+        real_scan_directory = scanner.scan_directory
+
+        def counting_scan_directory(directory, *args, **kwargs):
+            walked.append(directory)
+            return real_scan_directory(directory, *args, **kwargs)
+
+        monkeypatch.setattr(scanner, "scan_directory", counting_scan_directory)
+
+        with override_settings(TEMPLATES=templates_setting(tmp_path, f"{tmp_path}/.")):
+            assert scan_templates() == {"home", "hero:pencil"}
+
+        assert walked == [tmp_path]
+
+
+class TestScanTemplatesPerApp:
+    """Tests for scan_templates_per_app function."""
+
+    def test_groups_icons_per_template_root(self, tmp_path):
+        """Should map each template root to its icons grouped by namespace."""
+        site, extra = tmp_path / "site", tmp_path / "extra"
+        site.mkdir()
+        extra.mkdir()
+        (site / "base.html").write_text('{% icon "home" %}{% icon "hero:pencil" %}')
+        (extra / "page.html").write_text('{% icon "cart" %}')
+
+        with override_settings(TEMPLATES=templates_setting(site, extra, site)):
+            result = scan_templates_per_app()
+
+        assert result == {
+            site: {"ion": {"home"}, "hero": {"pencil"}},
+            extra: {"ion": {"cart"}},
+        }
+
+    def test_merges_batches_by_namespace(self, tmp_path, monkeypatch):
+        """Should merge the per-batch namespace groupings of one app."""
+        monkeypatch.setattr(scanner, "SCAN_BATCH_FILES", 1)
+        (tmp_path / "partials").mkdir()
+        (tmp_path / "base.html").write_text('{% icon "home" %}{% icon "hero:x" %}')
+        (tmp_path / "partials" / "nav.html").write_text('{% icon "cart" %}{% icon "hero:y" %}')
+
+        with override_settings(TEMPLATES=templates_setting(tmp_path)):
+            result = scan_templates_per_app("tabler")
+
+        assert result == {tmp_path: {"tabler": {"home", "cart"}, "hero": {"x", "y"}}}
+
+    def test_scans_apps_in_processes(self, tmp_path, monkeypatch):
+        """Should give the same result when templates are matched in worker processes."""
+        monkeypatch.setattr(scanner, "PROCESS_SCAN_MIN_BYTES", 0)
+        dirs = [tmp_path / name for name in ("a", "b", "c")]
+        for i, d in enumerate(dirs):
+            d.mkdir()
+            (d / "page.html").write_text(f'{{% icon "icon-{i}" %}}{{% icon "hero:x" %}}')
+
+        with override_settings(TEMPLATES=templates_setting(*dirs)):
+            result = scan_templates_per_app()
+
+        assert result == {d: {"ion": {f"icon-{i}"}, "hero": {"x"}} for i, d in enumerate(dirs)}
+
+    def test_worker_results_fill_parent_cache(self, tmp_path, monkeypatch):
+        """Should cache the workers' per-file results so the parent does not rescan."""
+        monkeypatch.setattr(scanner, "PROCESS_SCAN_MIN_BYTES", 0)
+        page = tmp_path / "page.html"
+        page.write_text('{% icon "home" %}')
+
+        def fail(*args):
+            raise AssertionError("template matched in the parent process")
+
+        monkeypatch.setattr(scanner, "_read_and_match", fail)
+        monkeypatch.setattr(scanner, "_match_batch", fail)
+
+        with override_settings(TEMPLATES=templates_setting(tmp_path)):
+            result = scan_templates_per_app()
+
+        assert result == {tmp_path: {"ion": {"home"}}}
+        assert scanner._FILE_CACHE[str(page)][2] == {"home"}
+
+    def test_small_corpus_skips_processes(self, tmp_path, monkeypatch):
+        """Should not start a process pool for less than PROCESS_SCAN_MIN_BYTES."""
+        (tmp_path / "page.html").write_text('{% icon "home" %}')
+
+        def fail(*args, **kwargs):
+            raise AssertionError("process pool started")
+
+        monkeypatch.setattr(scanner, "ProcessPoolExecutor", fail)
+
+        with override_settings(TEMPLATES=templates_setting(tmp_path)):
+            result = scan_templates_per_app()
+
+        assert result == {tmp_path: {"ion": {"home"}}}
+
+    def test_worker_processes_apply_size_limit(self, tmp_path, monkeypatch):
+        """Should apply MAX_TEMPLATE_BYTES when scanning in worker processes."""
+        monkeypatch.setattr(scanner, "PROCESS_SCAN_MIN_BYTES", 0)
+        (tmp_path / "page.html").write_text('{% icon "home" %}')
+        (tmp_path / "huge.html").write_text('{% icon "cart" %}' + "x" * 100)
+
+        with override_settings(
+            TEMPLATES=templates_setting(tmp_path), DJICONS={"MAX_TEMPLATE_BYTES": 50}
+        ):
+            result = scan_templates_per_app()
+
+        assert result == {tmp_path: {"ion": {"home"}}}
+
+    def test_app_templates_dir_maps_to_app(self, tmp_path):
+        """Should key an app's templates/ dir listed in DIRS by the app root."""
+        app = tmp_path / "shop"
+        (app / "templates").mkdir(parents=True)
+        (app / "__init__.py").touch()
+        (app / "templates" / "list.html").write_text('{% icon "cart" %}')
+
+        with override_settings(TEMPLATES=templates_setting(app / "templates")):
+            result = scan_templates_per_app("tabler")
+
+        assert result == {app: {"tabler": {"cart"}}}
+
 
 class TestParseIconName:
     """Tests for parse_icon_name function."""
@@ -126,6 +507,12 @@ class TestParseIconName:
         assert namespace == "hero"
         assert name == "pencil"
 
+    def test_name_with_multiple_colons(self):
+        """Test only the first colon separates the namespace."""
+        namespace, name = parse_icon_name("custom:sub:icon")
+        assert namespace == "custom"
+        assert name == "sub:icon"
+
     def test_custom_default_namespace(self):
         """Test custom default namespace."""
         namespace, name = parse_icon_name("home", default_namespace="tabler")
@@ -158,3 +545,9 @@ class TestGroupIconsByNamespace:
         """Test grouping empty set."""
         grouped = group_icons_by_namespace(set())
         assert grouped == {}
+
+    def test_returns_plain_dict(self):
+        """Test the grouping is returned as a plain dict, not a defaultdict."""
+        grouped = group_icons_by_namespace({"home"})
+        assert type(grouped) is dict
+        assert "hero" not in grouped